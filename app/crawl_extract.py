@@ -1,11 +1,11 @@
 # app/crawl_extract.py
 import os
-import json
 import asyncio
-import hashlib
 from datetime import datetime
 from typing import Dict, Iterable, List, Optional
 
+import orjson
+import xxhash
 from crawl4ai import AsyncWebCrawler
 
 DATA_DIR=os.path.join("app", "data")
@@ -27,24 +27,30 @@ def ensure_dirs():
 def read_jsonl(path: str) -> Iterable[Dict]:
     if not os.path.exists(path):
         return []
-    with open(path, "r", encoding="utf-8") as f:
+    # 바이트로 읽어서 orjson에 그대로 넘긴다 (디코딩 왕복 없음)
+    with open(path, "rb", buffering=1 << 20) as f:
         for line in f:
             line = line.strip()
             if not line:
                 continue
             try:
-                yield json.loads(line)
-            except json.JSONDecodeError:
+                yield orjson.loads(line)
+            except orjson.JSONDecodeError:
                 # 일부 라인이 JSON이 아닐 수 있으니 스킵
                 continue
 
 def write_jsonl(path: str, rows: List[Dict]):
-    with open(path, "a", encoding="utf-8") as f:
-        for r in rows:
-            f.write(json.dumps(r, ensure_ascii=False) + "\n")
+    # 배치를 한 번의 write로 append
+    with open(path, "ab") as f:
+        f.write(b"".join(orjson.dumps(r, option=orjson.OPT_APPEND_NEWLINE) for r in rows))
+
+def write_markdown(path: str, text: str):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
 
 def sha1(s: str) -> str:
-    return hashlib.sha1(s.encode("utf-8")).hexdigest()
+    # 파일명용 해시라 암호학적 강도는 필요 없음
+    return xxhash.xxh64(s.encode("utf-8")).hexdigest()
 
 # ----- Input normalization -----
 def pick(d: Dict, *keys, default=None):
@@ -54,27 +60,22 @@ def pick(d: Dict, *keys, default=None):
     return default
 
 def load_items(files: List[str]) -> List[Dict]:
+    # 읽으면서 바로 중복 URL 제거 (유지 순서)
+    seen = set()
     items = []
     for p in files:
         for rec in read_jsonl(p):
             url = pick(rec, "url", "link")
-            title = pick(rec, "title", "htmlTitle")
-            if not url:
+            if not url or url in seen:
                 continue
+            seen.add(url)
+            title = pick(rec, "title", "htmlTitle")
             items.append({
                 "url": url,
                 "title": title or "",
                 "source_file": os.path.basename(p),
             })
-    # 중복 URL 제거 (유지 순서)
-    seen = set()
-    deduped = []
-    for it in items:
-        if it["url"] in seen:
-            continue
-        seen.add(it["url"])
-        deduped.append(it)
-    return deduped
+    return items
 
 # ----- Crawl -----
 async def fetch_one(crawler: AsyncWebCrawler, item: Dict, sem: asyncio.Semaphore, retries: int = 2, timeout: int = 30) -> Dict:
@@ -109,10 +110,10 @@ async def fetch_one(crawler: AsyncWebCrawler, item: Dict, sem: asyncio.Semaphore
                 # 저장
                 fname = f"{sha1(url)}.md"
                 fpath = os.path.join(OUT_MD_DIR, fname)
-                with open(fpath, "w", encoding="utf-8") as f:
-                    # 앞에 메타 주석 추가하면 디버깅 편함
-                    meta = f"<!-- title: {title}\nurl: {url}\nfetched_at: {out['fetched_at']}\n-->".strip()
-                    f.write(meta + "\n\n" + md)
+                # 앞에 메타 주석 추가하면 디버깅 편함
+                meta = f"<!-- title: {title}\nurl: {url}\nfetched_at: {out['fetched_at']}\n-->".strip()
+                # 디스크 쓰기는 스레드로 넘겨서 다른 크롤과 겹치게 한다
+                await asyncio.to_thread(write_markdown, fpath, meta + "\n\n" + md)
                 out["ok"] = True
                 out["markdown_path"] = os.path.relpath(fpath, start=".").replace("\\", "/")
                 out["markdown_chars"] = len(md)
@@ -161,8 +162,8 @@ async def run_crawl(concurrency: int = 8) -> None:
             status = "OK" if res["ok"] else f"ERR({res['error']})"
             print(f"[{len(done_ok)+len(results_batch)}/{len(items)}] {status} → {res['url']}")
             if len(results_batch) >= batch_size:
-                write_jsonl(OUT_JSONL, results_batch)
-                results_batch.clear()
+                await asyncio.to_thread(write_jsonl, OUT_JSONL, results_batch)
+                results_batch = []
 
     # 남은 것 flush
     if results_batch:
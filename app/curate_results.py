@@ -1,12 +1,16 @@
 # app/curate_results.py
 import os
 import re
-import json
 import math
+import heapq
 import glob
 import yaml
-import hashlib
+import orjson
+import xxhash
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
+from functools import lru_cache
 from urllib.parse import urlparse
 
 CRAWL_RESULT_DIR=os.path.join("app","crawl_result")
@@ -20,6 +24,8 @@ CURATED_MD = os.path.join(RESULTS_DIR, "curated.md")
 PROFILE_YAML = os.path.join("config", "profile.yaml")
 LLM_YAML = os.path.join("config", "llm.yaml")
 
+READ_WORKERS = 32
+
 def load_yaml(path, default):
     if not os.path.exists(path):
         return default
@@ -28,18 +34,16 @@ def load_yaml(path, default):
 
 def read_jsonl(path):
     if not os.path.exists(path):
-        return []
-    rows = []
-    with open(path, "r", encoding="utf-8") as f:
+        return
+    with open(path, "rb", buffering=1 << 20) as f:
         for line in f:
             line = line.strip()
             if not line:
                 continue
             try:
-                rows.append(json.loads(line))
-            except json.JSONDecodeError:
+                yield orjson.loads(line)
+            except orjson.JSONDecodeError:
                 continue
-    return rows
 
 def read_text(path):
     try:
@@ -51,6 +55,7 @@ def read_text(path):
 def safe_lower(s):
     return (s or "").lower()
 
+@lru_cache(maxsize=8192)
 def norm_domain(u):
     try:
         netloc = urlparse(u).netloc.lower()
@@ -60,101 +65,112 @@ def norm_domain(u):
     except Exception:
         return ""
 
-def contains_any(text, patterns):
-    text_l = safe_lower(text)
-    for kw in patterns or []:
-        if isinstance(kw, str) and kw.strip():
-            if kw.startswith("/") and kw.endswith("/"):
-                # 정규식 패턴 지원: /.../
-                try:
-                    if re.search(kw[1:-1], text, flags=re.IGNORECASE):
-                        return True
-                except re.error:
-                    pass
-            else:
-                if kw.lower() in text_l:
-                    return True
-    return False
-
-def keyword_score(text, include, exclude):
-    if not text:
-        return 0.0
-    text_l = safe_lower(text)
+def is_regex_kw(kw):
+    return kw.startswith("/") and kw.endswith("/")
 
-    pos = 0
-    for kw in include or []:
-        if not kw: 
+def compile_keywords(keywords):
+    """
+    키워드 목록을 (소문자 리터럴 튜플, 정규식 패턴 목록)으로 나눈다.
+    리터럴 소문자화와 /.../ 정규식 컴파일을 실행당 한 번만 하고,
+    잘못된 정규식은 여기서 버린다.
+    """
+    literals = []
+    regexes = []
+    for kw in keywords or []:
+        if not isinstance(kw, str) or not kw:
             continue
-        if kw.startswith("/") and kw.endswith("/"):
+        if is_regex_kw(kw):
             try:
-                hits = re.findall(kw[1:-1], text, flags=re.IGNORECASE)
-                pos += len(hits)
+                regexes.append(re.compile(kw[1:-1], re.IGNORECASE))
             except re.error:
                 pass
         else:
-            pos += text_l.count(kw.lower())
+            literals.append(kw.lower())
+    return tuple(literals), regexes
 
-    neg = 0
-    for kw in exclude or []:
-        if not kw:
-            continue
-        if kw.startswith("/") and kw.endswith("/"):
-            try:
-                hits = re.findall(kw[1:-1], text, flags=re.IGNORECASE)
-                neg += len(hits)
-            except re.error:
-                pass
-        else:
-            neg += text_l.count(kw.lower())
+def contains_any(text, compiled):
+    """compiled는 compile_keywords()의 결과."""
+    literals, regexes = compiled
+    text_l = safe_lower(text)
+    if any(k in text_l for k in literals):
+        return True
+    return any(p.search(text or "") for p in regexes)
+
+def count_keywords(text, text_l, compiled):
+    # 키워드별로 따로 센다 (서로 겹치는 키워드도 각각 카운트)
+    literals, regexes = compiled
+    n = sum(text_l.count(k) for k in literals)
+    for p in regexes:
+        n += len(p.findall(text))
+    return n
+
+def keyword_score(text, include, exclude):
+    """include/exclude는 compile_keywords()의 결과."""
+    if not text:
+        return 0.0
+    text_l = safe_lower(text)
+
+    pos = count_keywords(text, text_l, include)
+    neg = count_keywords(text, text_l, exclude)
 
     # 간단 정규화: 양수는 로그 스케일, 음수는 강한 패널티
     pos_part = math.log1p(pos) if pos > 0 else 0.0
     neg_part = 1.5 * math.log1p(neg) if neg > 0 else 0.0
     return max(0.0, pos_part - neg_part)
 
-def recency_score(fetched_at_iso, half_life_days=14, hard_days_cutoff=365):
+def parse_utc(iso):
+    # ISO 문자열 → naive UTC datetime (실패하면 None)
+    if not iso:
+        return None
+    try:
+        dt = datetime.fromisoformat(iso.replace("Z", "+00:00"))
+    except Exception:
+        return None
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(timezone.utc).replace(tzinfo=None)
+    return dt
+
+def recency_scores(fetched_at_isos, half_life_days=14, hard_days_cutoff=365):
     """
-    fetched_at 기준으로 최근일수 가중.
+    fetched_at 기준으로 최근일수 가중 (전체 행을 한 번에 numpy로 계산).
     절반감쇠(half-life) 지수함수: score = 0.5 ** (days/half_life)
-    너무 오래된 건 컷오프 페널티.
+    너무 오래된 건 컷오프 페널티, 날짜 정보가 없으면 약한 점수(0.2).
     """
-    if not fetched_at_iso:
-        return 0.2  # 정보 없음 → 약한 점수
-    try:
-        dt = datetime.fromisoformat(fetched_at_iso.replace("Z", "+00:00"))
-    except Exception:
-        return 0.2
-    now = datetime.now(timezone.utc)
-    days = max(0, (now - dt).days)
-    s = 0.5 ** (days / max(1, half_life_days))
-    if days > hard_days_cutoff:
-        s *= 0.3
+    stamps = np.array([parse_utc(s) for s in fetched_at_isos], dtype="datetime64[s]")
+    now = np.datetime64(datetime.now(timezone.utc).replace(tzinfo=None), "s")
+    missing = np.isnat(stamps)
+    days = (now - np.where(missing, now, stamps)) // np.timedelta64(1, "D")
+    days = np.maximum(days, 0)
+    s = np.power(0.5, days / max(1, half_life_days))
+    s[days > hard_days_cutoff] *= 0.3
+    s[missing] = 0.2
     return s
 
-def length_score(n_chars, min_chars, max_chars):
-    if n_chars is None or n_chars <= 0:
-        return 0.0
+def length_scores(n_chars, min_chars, max_chars):
+    """n_chars: 본문 길이 배열 → 길이 점수 배열."""
+    n = np.asarray(n_chars, dtype=np.float64)
     # 너무 짧으면 0, 너무 길면 완만히 감소, 적당 범위에서 최고
-    if n_chars < min_chars:
-        return 0.2 * (n_chars / max(1, min_chars))
-    # 스위트 스팟: [min_chars, max_chars] 부근
-    if n_chars <= max_chars:
-        return 1.0
+    short = 0.2 * (n / max(1, min_chars))
     # 과도하게 길면 서서히 감소
-    over = n_chars - max_chars
-    return max(0.4, 1.0 / (1.0 + over / 100000))
+    # np.where는 모든 분기를 계산하므로, 쓰이지 않는 n == max_chars-100000 위치의 0 나눗셈 경고는 무시
+    with np.errstate(divide="ignore"):
+        long_ = np.maximum(0.4, 1.0 / (1.0 + (n - max_chars) / 100000))
+    # 스위트 스팟: [min_chars, max_chars] 부근
+    s = np.where(n < min_chars, short, np.where(n <= max_chars, 1.0, long_))
+    return np.where(n <= 0, 0.0, s)
 
 def domain_score(domain, prefer_domains, avoid_domains):
+    # prefer/avoid는 main에서 미리 소문자 set으로 만들어 넘긴다
     if not domain:
         return 0.3
-    if domain in (d.lower() for d in (prefer_domains or [])):
+    if domain in (prefer_domains or ()):
         return 1.0
-    if domain in (d.lower() for d in (avoid_domains or [])):
+    if domain in (avoid_domains or ()):
         return 0.0
     return 0.6
 
 def sha1(s: str) -> str:
-    return hashlib.sha1((s or "").encode("utf-8")).hexdigest()
+    return xxhash.xxh64((s or "").encode("utf-8")).hexdigest()
 
 def main():
     os.makedirs(RESULTS_DIR, exist_ok=True)
@@ -166,10 +182,10 @@ def main():
     weights = profile.get("weights", {})
     snippets = profile.get("snippets", {})
 
-    include_kw = prefs.get("include_keywords", [])
-    exclude_kw = prefs.get("exclude_keywords", [])
-    prefer_domains = [d.lower() for d in prefs.get("prefer_domains", [])]
-    avoid_domains = [d.lower() for d in prefs.get("avoid_domains", [])]
+    include_kw = compile_keywords(prefs.get("include_keywords", []))
+    exclude_kw = compile_keywords(prefs.get("exclude_keywords", []))
+    prefer_domains = {d.lower() for d in prefs.get("prefer_domains", [])}
+    avoid_domains = {d.lower() for d in prefs.get("avoid_domains", [])}
 
     final_n = limits.get("final_n", 40) or 40
     min_chars = limits.get("min_chars", 500) or 500
@@ -186,27 +202,28 @@ def main():
 
     max_snip = snippets.get("max_chars", 700) or 700
 
-    rows = read_jsonl(CONTENTS_JSONL)
+    rows = list(read_jsonl(CONTENTS_JSONL))
     if not rows:
         print("[curate] No contents.jsonl found or empty. Run crawl step first.")
         return
 
-    # 페이지 로드 & 스코어링
-    scored = []
-    for r in rows:
-        if not r.get("ok"):
-            continue
-        url = r.get("url", "")
+    # 페이지 로드: 파일 I/O만 하므로 스레드로 병렬 읽기 (순서 유지)
+    rows = [r for r in rows if r.get("ok") and r.get("markdown_path")]
+    paths = [
+        p if os.path.isabs(p) else os.path.join(".", p)
+        for p in (r["markdown_path"] for r in rows)
+    ]
+    with ThreadPoolExecutor(max_workers=READ_WORKERS) as ex:
+        contents = list(ex.map(read_text, paths))
+
+    pages = [(r, c) for r, c in zip(rows, contents) if c]
+    fetched = [r.get("fetched_at") if use_fetched_at else None for r, _ in pages]
+    rs_vec = recency_scores(fetched, half_life_days, hard_days_cutoff)
+
+    # 1) 행 단위로만 가능한 것들(본문 정리, 키워드, 도메인)을 컬럼으로 모은다
+    bodies, domains, ks_list = [], [], []
+    for r, content in pages:
         title = r.get("title", "") or ""
-        markdown_path = r.get("markdown_path")
-        fetched_at = r.get("fetched_at") if use_fetched_at else None
-
-        if not markdown_path:
-            continue
-        fullpath = markdown_path if os.path.isabs(markdown_path) else os.path.join(".", markdown_path)
-        content = read_text(fullpath)
-        if not content:
-            continue
 
         # 메타 주석 제거 후 본문만으로 판단(선택)
         if content.startswith("<!--"):
@@ -218,15 +235,23 @@ def main():
         else:
             content_for_score = content
 
-        n_chars = len(content_for_score)
-        domain = norm_domain(url)
+        bodies.append(content_for_score)
+        domains.append(norm_domain(r.get("url", "")))
+        ks_list.append(keyword_score(title + "\n" + content_for_score, include_kw, exclude_kw))
 
-        ks = keyword_score(title + "\n" + content_for_score, include_kw, exclude_kw)
-        ds = domain_score(domain, prefer_domains, avoid_domains)
-        rs = recency_score(fetched_at, half_life_days, hard_days_cutoff)
-        ls = length_score(n_chars, min_chars, max_chars)
+    # 2) 점수 합산은 컬럼 단위로 한 번에
+    ks_arr = np.array(ks_list, dtype=np.float64)
+    ds_arr = np.array([domain_score(d, prefer_domains, avoid_domains) for d in domains], dtype=np.float64)
+    chars_arr = np.array([len(b) for b in bodies], dtype=np.int64)
+    ls_arr = length_scores(chars_arr, min_chars, max_chars)
+    final = (w_keyword * ks_arr) + (w_domain * ds_arr) + (w_recency * rs_vec) + (w_length * ls_arr)
 
-        score = (w_keyword * ks) + (w_domain * ds) + (w_recency * rs) + (w_length * ls)
+    # 3) 결과 레코드 구성
+    scored = []
+    for i, (r, _) in enumerate(pages):
+        domain = domains[i]
+        ks, ds, rs = float(ks_arr[i]), float(ds_arr[i]), float(rs_vec[i])
+        n_chars = int(chars_arr[i])
 
         reason_bits = []
         if ks > 0: reason_bits.append(f"keywords+:{ks:.2f}")
@@ -236,17 +261,17 @@ def main():
         if n_chars < min_chars: reason_bits.append("too-short")
         if n_chars > max_chars: reason_bits.append("too-long")
 
-        snippet = content_for_score.strip().replace("\r"," ").replace("\n", " ")
+        snippet = bodies[i].strip().replace("\r"," ").replace("\n", " ")
         if len(snippet) > max_snip:
             snippet = snippet[:max_snip].rstrip() + "…"
 
         scored.append({
-            "url": url,
-            "title": title,
+            "url": r.get("url", ""),
+            "title": r.get("title", "") or "",
             "domain": domain,
-            "score_raw": score,
+            "score_raw": float(final[i]),
             "reasons": reason_bits,
-            "fetched_at": fetched_at,
+            "fetched_at": fetched[i],
             "markdown_path": r.get("markdown_path"),
             "chars": n_chars,
             "snippet": snippet
@@ -282,15 +307,13 @@ def main():
             it["score_llm"] = 0.0
             it["score"] = it["score_raw"]
 
-    # 최종 정렬 & 자르기
-    scored.sort(key=lambda x: x["score"], reverse=True)
+    # 최종 상위 N개만 뽑기 (전체 정렬 불필요)
     final_n = int(final_n) if isinstance(final_n, int) or (isinstance(final_n, str) and final_n.isdigit()) else 40
-    top = scored[:final_n]
+    top = heapq.nlargest(final_n, scored, key=lambda x: x["score"])
 
     # 저장: JSONL
-    with open(CURATED_JSONL, "w", encoding="utf-8") as f:
-        for t in top:
-            f.write(json.dumps(t, ensure_ascii=False) + "\n")
+    with open(CURATED_JSONL, "wb") as f:
+        f.write(b"".join(orjson.dumps(t, option=orjson.OPT_APPEND_NEWLINE) for t in top))
 
     # 저장: Markdown 요약
     lines = ["# Curated Results\n"]
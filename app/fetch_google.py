@@ -1,5 +1,6 @@
-import os, httpx, time
+import os, httpx, asyncio
 from utils.save_data import save_jsonl
+from utils.log_setup import setup_logging
 from dotenv import load_dotenv
 load_dotenv()
 
@@ -7,19 +8,28 @@ API = os.getenv("GOOGLE_API_KEY")
 CX  = os.getenv("GOOGLE_CX")
 url = "https://www.googleapis.com/customsearch/v1"
 
-all_items = []
-start = 1
-while start <= 31:  # 대략 4페이지(최대 10개씩)
+STARTS = (1, 11, 21, 31)  # 대략 4페이지(최대 10개씩)
+MAX_CONCURRENCY = 2       # 동시 요청 수 상한 (레이트 리밋 걸리면 1로)
+
+async def fetch_page(client, sem, start):
     params = {"key": API, "cx": CX, "q": "AI product launch", "num": 10, "start": start, "dateRestrict": "d7"}
-    r = httpx.get(url, params=params, timeout=20)
+    async with sem:
+        r = await client.get(url, params=params, timeout=20)
     r.raise_for_status()
-    j = r.json()
-    items = j.get("items", [])
-    if not items: break
-    all_items.extend(items)
-    start += 10
-    time.sleep(0.2)   # 살짝 천천히
+    return r.json().get("items", [])
+
+async def fetch_all():
+    sem = asyncio.Semaphore(MAX_CONCURRENCY)
+    async with httpx.AsyncClient(http2=True) as client:
+        pages = await asyncio.gather(*(fetch_page(client, sem, s) for s in STARTS))
+    all_items = []
+    for items in pages:
+        if not items: break  # 빈 페이지 이후는 결과 없음
+        all_items.extend(items)
+    return all_items
 
 # MAIN =============================================================
 if __name__ =="__main__":
+    setup_logging(quiet_httpx=True)
+    all_items = asyncio.run(fetch_all())
     save_jsonl(all_items, "app/data/google_data.jsonl")
@@ -1,9 +1,11 @@
 import feedparser
 import hashlib
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
 from dateutil import parser as dtparse
 from urllib.parse import urlencode
 from utils.save_data import save_jsonl
+from utils.log_setup import setup_logging
 import itertools
 
 # RSS 피드 목록 ===============================================
@@ -64,9 +66,11 @@ def norm_item(feed_key, entry):
     }
 
 def fetch_all(feeds: dict[str, str]):
+    # feedparser.parse는 네트워크 대기가 대부분이라 스레드로 동시에 받는다
+    with ThreadPoolExecutor(max_workers=max(1, min(32, len(feeds)))) as ex:
+        parsed_list = list(ex.map(feedparser.parse, feeds.values()))
     all_items = []
-    for key, url in feeds.items():
-        parsed = feedparser.parse(url)
+    for key, parsed in zip(feeds.keys(), parsed_list):
         for e in parsed.entries:
             all_items.append(norm_item(key, e))
     return all_items
@@ -90,6 +94,7 @@ def sort_by_date(items):
 
 # MAIN =============================================================
 if __name__ == "__main__":
+    setup_logging()
     items = fetch_all(FEEDS)
     items = dedup(items)
     items = sort_by_date(items)
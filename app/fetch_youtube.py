@@ -14,14 +14,16 @@ YouTube 검색 유틸 (환경변수/파일변수 기반 단일 실행)
 """
 
 from __future__ import annotations
-import os, re, time, json
-from typing import List, Dict, Any, Optional
+import os, re, time, json, asyncio, sqlite3, logging
+from typing import List, Dict, Any, Iterator, Optional
 from datetime import datetime, timezone
+from functools import lru_cache
 from pathlib import Path
 
 import httpx
 from dateutil import parser as dtparse
 from dotenv import load_dotenv
+from tenacity import retry, stop_after_attempt, wait_exponential_jitter, retry_if_exception_type
 
 # ───────────────────────────────────────────────────────────
 # 0) 실행 설정 (여기만 수정해서 사용)
@@ -53,40 +55,75 @@ load_dotenv()
 YOUTUBE_API_KEY = os.getenv("YOUTUBE_API_KEY")
 BASE = "https://www.googleapis.com/youtube/v3"
 
+log = logging.getLogger(__name__)
+
+# 이번 실행에서 쓴 API quota (search.list=100, videos.list=1)
+_QUOTA = {"units": 0}
+
+# handle → channelId 캐시 (search.list 한 번 = 100 quota)
+CHANNEL_CACHE_PATH = Path("app/results/.channel_id_cache.json")
+CHANNEL_CACHE_TTL = 7 * 86400
+
+# videoId → 상세정보 캐시 (쿼리 튜닝하며 반복 실행할 때 재요청 방지)
+VIDEOS_CACHE_PATH = Path("app/results/.videos_cache.sqlite")
+VIDEOS_CACHE_TTL = 3600
+
 # 공용 저장 유틸
 from utils.save_data import save_jsonl  # ← 여기로 공통 저장 통일
+from utils.log_setup import setup_logging
 
 # ───────────────────────────────────────────────────────────
 # 유틸
 # ───────────────────────────────────────────────────────────
+_CHANNEL_ID_RE = re.compile(r"UC[a-zA-Z0-9_-]{22}")
+_CHANNEL_URL_RE = re.compile(r"/channel/(UC[a-zA-Z0-9_-]{22})")
+_WS_RE = re.compile(r"\s+")
+_NONSLUG_RE = re.compile(r"[^a-z0-9\-_]+")
+
+@lru_cache(maxsize=4096)
 def rfc3339(dt_str: Optional[str]) -> Optional[str]:
     if not dt_str:
         return None
-    dt = dtparse.parse(dt_str)
+    try:
+        # API가 주는 RFC3339는 fromisoformat(C 구현)으로 충분, 예외적인 형식만 dateutil
+        dt = datetime.fromisoformat(dt_str.replace("Z", "+00:00"))
+    except ValueError:
+        dt = dtparse.parse(dt_str)
     if dt.tzinfo is None:
         dt = dt.replace(tzinfo=timezone.utc)
     return dt.astimezone(timezone.utc).isoformat()
 
-def sleep_backoff(i: int):
-    time.sleep(min(2 ** i, 10))
-
 def chunks(lst, n):
     for i in range(0, len(lst), n):
         yield lst[i:i+n]
 
 def extract_channel_id_from_url_or_handle(s: str) -> Optional[str]:
     s = s.strip()
-    if re.fullmatch(r"UC[a-zA-Z0-9_-]{22}", s):
+    if _CHANNEL_ID_RE.fullmatch(s):
         return s
-    m = re.search(r"/channel/(UC[a-zA-Z0-9_-]{22})", s)
+    m = _CHANNEL_URL_RE.search(s)
     if m:
         return m.group(1)
     return None
 
+def _load_channel_cache() -> Dict[str, Dict[str, Any]]:
+    try:
+        with CHANNEL_CACHE_PATH.open("r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+def _save_channel_cache(cache: Dict[str, Dict[str, Any]]):
+    CHANNEL_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+    tmp = CHANNEL_CACHE_PATH.with_suffix(CHANNEL_CACHE_PATH.suffix + ".tmp")
+    with tmp.open("w", encoding="utf-8") as f:
+        json.dump(cache, f, ensure_ascii=False)
+    os.replace(tmp, CHANNEL_CACHE_PATH)
+
 def _slug(s: str) -> str:
     s = (s or "").strip().lower()
-    s = re.sub(r"\s+", "-", s)
-    s = re.sub(r"[^a-z0-9\-_]+", "", s)
+    s = _WS_RE.sub("-", s)
+    s = _NONSLUG_RE.sub("", s)
     return s[:80] or "query"
 
 def _default_outpath(scope: str, query: str, channel: Optional[str]) -> Path:
@@ -101,43 +138,89 @@ def _default_outpath(scope: str, query: str, channel: Optional[str]) -> Path:
 # ───────────────────────────────────────────────────────────
 # API 호출
 # ───────────────────────────────────────────────────────────
-def yt_get(client: httpx.Client, path: str, params: Dict[str, Any]) -> Dict[str, Any]:
+def _make_client() -> httpx.AsyncClient:
+    """
+    파이프라인 전체에서 재사용할 클라이언트.
+    HTTP/2 + keep-alive로 TLS 핸드셰이크를 한 번만 하고, base_url과 API 키는 여기서 한 번만 바인딩.
+    """
     if not YOUTUBE_API_KEY:
         raise RuntimeError("환경변수 YOUTUBE_API_KEY가 설정되지 않았습니다.")
-    p = {"key": YOUTUBE_API_KEY, **params}
-    url = f"{BASE}/{path}"
-    for attempt in range(5):
-        try:
-            r = client.get(url, params=p, timeout=30)
-            if r.status_code == 429 or r.status_code >= 500:
-                sleep_backoff(attempt)
-                continue
-            r.raise_for_status()
-            return r.json()
-        except httpx.HTTPError:
-            if attempt == 4:
-                raise
-            sleep_backoff(attempt)
-    raise RuntimeError("YouTube API 요청 실패")
-
-def resolve_channel_id(client: httpx.Client, ident: str) -> str:
+    return httpx.AsyncClient(
+        base_url=BASE,
+        http2=True,
+        timeout=30,
+        limits=httpx.Limits(max_keepalive_connections=10, max_connections=20, keepalive_expiry=30),
+        headers={"User-Agent": "InfoMining/1.0", "Accept-Encoding": "gzip"},
+        params={"key": YOUTUBE_API_KEY},
+    )
+
+class _RetryableStatus(RuntimeError):
+    """429/5xx 응답. Retry-After(초)가 있으면 같이 들고 다닌다."""
+    def __init__(self, status_code: int, retry_after: float = 0.0):
+        super().__init__(f"YouTube API 요청 실패 (status={status_code})")
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+def _retry_after_seconds(value: Optional[str]) -> float:
+    # HTTP-date 형식은 무시하고 초 단위만 지원
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        return 0.0
+
+_jitter_backoff = wait_exponential_jitter(initial=1, max=32)
+
+def _wait_retry_after(retry_state) -> float:
+    # 지터 백오프와 서버가 준 Retry-After 중 긴 쪽만큼 대기
+    delay = _jitter_backoff(retry_state)
+    exc = retry_state.outcome.exception()
+    if isinstance(exc, _RetryableStatus):
+        delay = max(delay, exc.retry_after)
+    return delay
+
+@retry(
+    stop=stop_after_attempt(5),
+    wait=_wait_retry_after,
+    retry=retry_if_exception_type((httpx.TransportError, _RetryableStatus)),
+    reraise=True,
+)
+async def yt_get(client: httpx.AsyncClient, path: str, params: Dict[str, Any]) -> Dict[str, Any]:
+    r = await client.get(path, params=params)
+    if r.status_code == 429 or r.status_code >= 500:
+        raise _RetryableStatus(r.status_code, _retry_after_seconds(r.headers.get("Retry-After")))
+    r.raise_for_status()
+    data = r.json()
+    _QUOTA["units"] += 100 if path == "search" else 1
+    return data
+
+async def resolve_channel_id(client: httpx.AsyncClient, ident: str) -> str:
     cid = extract_channel_id_from_url_or_handle(ident)
     if cid:
         return cid
     q = ident.lstrip("@").strip()
-    data = yt_get(client, "search", {
+    key = q.lower()
+    cache = _load_channel_cache()
+    hit = cache.get(key)
+    if hit and time.time() - hit.get("ts", 0) < CHANNEL_CACHE_TTL:
+        return hit["id"]
+
+    data = await yt_get(client, "search", {
         "part": "snippet",
         "q": q,
         "type": "channel",
         "maxResults": 1,
+        "fields": "items(snippet/channelId)",
     })
     items = data.get("items", [])
     if not items:
         raise ValueError(f"채널을 찾을 수 없습니다: {ident}")
-    return items[0]["snippet"]["channelId"]
+    cid = items[0]["snippet"]["channelId"]
+    cache[key] = {"id": cid, "ts": time.time()}
+    _save_channel_cache(cache)
+    return cid
 
-def search_list(
-    client: httpx.Client,
+async def search_list(
+    client: httpx.AsyncClient,
     q: str,
     channel_id: Optional[str] = None,
     published_after: Optional[str] = None,
@@ -153,6 +236,8 @@ def search_list(
             "type": "video",
             "order": order,
             "maxResults": min(50, max_items - len(results)),
+            # 실제로 쓰는 필드만 받아서 응답 크기/JSON 파싱 비용을 줄인다
+            "fields": "nextPageToken,items(id/videoId,snippet(title,description,publishedAt,channelTitle,channelId,thumbnails))",
         }
         if channel_id:
             params["channelId"] = channel_id
@@ -161,7 +246,7 @@ def search_list(
         if page_token:
             params["pageToken"] = page_token
 
-        data = yt_get(client, "search", params)
+        data = await yt_get(client, "search", params)
         for it in data.get("items", []):
             sn = it.get("snippet", {})
             results.append({
@@ -180,53 +265,105 @@ def search_list(
             break
     return results
 
-def videos_list_details(client: httpx.Client, video_ids: List[str]) -> Dict[str, Dict[str, Any]]:
-    details: Dict[str, Dict[str, Any]] = {}
-    for batch in chunks(video_ids, 50):
-        data = yt_get(client, "videos", {
-            "part": "snippet,contentDetails,statistics",
-            "id": ",".join(batch),
-            "maxResults": 50
-        })
-        for v in data.get("items", []):
-            vid = v["id"]
-            details[vid] = {
-                "duration": v.get("contentDetails", {}).get("duration"),
-                "dimension": v.get("contentDetails", {}).get("dimension"),
-                "definition": v.get("contentDetails", {}).get("definition"),
-                "caption": v.get("contentDetails", {}).get("caption"),
-                "viewCount": v.get("statistics", {}).get("viewCount"),
-                "likeCount": v.get("statistics", {}).get("likeCount"),
-                "commentCount": v.get("statistics", {}).get("commentCount"),
-            }
+async def _videos_batch(client: httpx.AsyncClient, ids: List[str]) -> List[Dict[str, Any]]:
+    data = await yt_get(client, "videos", {
+        "part": "contentDetails,statistics",
+        "id": ",".join(ids),
+        "fields": "items(id,contentDetails(duration,dimension,definition,caption),statistics(viewCount,likeCount,commentCount))",
+    })
+    return data.get("items", [])
+
+def _video_detail(v: Dict[str, Any]) -> Dict[str, Any]:
+    cd = v.get("contentDetails", {})
+    st = v.get("statistics", {})
+    return {
+        "duration": cd.get("duration"),
+        "dimension": cd.get("dimension"),
+        "definition": cd.get("definition"),
+        "caption": cd.get("caption"),
+        "viewCount": st.get("viewCount"),
+        "likeCount": st.get("likeCount"),
+        "commentCount": st.get("commentCount"),
+    }
+
+def _open_videos_cache() -> sqlite3.Connection:
+    VIDEOS_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(VIDEOS_CACHE_PATH)
+    conn.execute("CREATE TABLE IF NOT EXISTS v(id TEXT PRIMARY KEY, ts REAL, payload BLOB)")
+    return conn
+
+def _cached_details(conn: sqlite3.Connection, video_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+    hits: Dict[str, Dict[str, Any]] = {}
+    cutoff = time.time() - VIDEOS_CACHE_TTL
+    # SQLite 바인드 변수 개수 제한 때문에 나눠서 조회
+    for batch in chunks(video_ids, 500):
+        sql = f"SELECT id, payload FROM v WHERE ts > ? AND id IN ({','.join('?' * len(batch))})"
+        for vid, payload in conn.execute(sql, (cutoff, *batch)):
+            hits[vid] = json.loads(payload)
+    return hits
+
+async def videos_list_details(client: httpx.AsyncClient, video_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+    conn = _open_videos_cache()
+    try:
+        details = _cached_details(conn, video_ids)
+        misses = [vid for vid in video_ids if vid not in details]
+
+        # 캐시에 없는 것만 50개 단위 배치로 동시에 요청 (같은 HTTP/2 커넥션 위에서 멀티플렉싱)
+        batches = await asyncio.gather(*(_videos_batch(client, b) for b in chunks(misses, 50)))
+        fresh = {v["id"]: _video_detail(v) for items in batches for v in items}
+        if fresh:
+            now = time.time()
+            with conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO v(id, ts, payload) VALUES (?, ?, ?)",
+                    [(vid, now, json.dumps(d)) for vid, d in fresh.items()],
+                )
+        details.update(fresh)
+    finally:
+        conn.close()
     return details
 
-def enrich_with_details(items: List[Dict[str, Any]], details: Dict[str, Dict[str, Any]]) -> List[Dict[str, Any]]:
+def dedup_videos(items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    # 페이지를 넘기다 보면 같은 videoId가 다시 나올 수 있음 → 처음 것만 유지
+    seen = set()
     out = []
     for it in items:
-        vid = it["videoId"]
-        d = details.get(vid, {})
-        it2 = {**it, **d}
-        it2["publishedAt"] = rfc3339(it2.get("publishedAt"))
-        out.append(it2)
+        if it["videoId"] in seen:
+            continue
+        seen.add(it["videoId"])
+        out.append(it)
     return out
 
+def enrich_with_details(items: List[Dict[str, Any]], details: Dict[str, Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+    # 리스트로 모으지 않고 하나씩 흘려보냄 → save_jsonl이 바로 소비
+    for it in items:
+        it2 = it.copy()
+        it2.update(details.get(it["videoId"]) or ())
+        it2["publishedAt"] = rfc3339(it.get("publishedAt"))
+        yield it2
+
 # ───────────────────────────────────────────────────────────
 # 실행 엔트리
 # ───────────────────────────────────────────────────────────
-def run_channel_search(channel: str, query: str, published_after: Optional[str], limit: int) -> List[Dict[str, Any]]:
-    with httpx.Client() as client:
-        channel_id = resolve_channel_id(client, channel)
-        items = search_list(client, q=query, channel_id=channel_id, published_after=published_after, max_items=limit)
-        details = videos_list_details(client, [x["videoId"] for x in items])
+async def _run_channel_search(channel: str, query: str, published_after: Optional[str], limit: int) -> Iterator[Dict[str, Any]]:
+    async with _make_client() as client:
+        channel_id = await resolve_channel_id(client, channel)
+        items = dedup_videos(await search_list(client, q=query, channel_id=channel_id, published_after=published_after, max_items=limit))
+        details = await videos_list_details(client, [x["videoId"] for x in items])
         return enrich_with_details(items, details)
 
-def run_global_search(query: str, published_after: Optional[str], limit: int) -> List[Dict[str, Any]]:
-    with httpx.Client() as client:
-        items = search_list(client, q=query, published_after=published_after, max_items=limit)
-        details = videos_list_details(client, [x["videoId"] for x in items])
+async def _run_global_search(query: str, published_after: Optional[str], limit: int) -> Iterator[Dict[str, Any]]:
+    async with _make_client() as client:
+        items = dedup_videos(await search_list(client, q=query, published_after=published_after, max_items=limit))
+        details = await videos_list_details(client, [x["videoId"] for x in items])
         return enrich_with_details(items, details)
 
+def run_channel_search(channel: str, query: str, published_after: Optional[str], limit: int) -> Iterator[Dict[str, Any]]:
+    return asyncio.run(_run_channel_search(channel, query, published_after, limit))
+
+def run_global_search(query: str, published_after: Optional[str], limit: int) -> Iterator[Dict[str, Any]]:
+    return asyncio.run(_run_global_search(query, published_after, limit))
+
 def main():
     mode = CONFIG["MODE"]
     query = CONFIG["QUERY"]
@@ -250,6 +387,8 @@ def main():
 
     out = Path(outpath) if outpath else default_out
     save_jsonl(data, out)  # ← 공통 저장
+    log.info("YouTube quota used: %d units", _QUOTA["units"])
 
 if __name__ == "__main__":
+    setup_logging(quiet_httpx=True)
     main()
@@ -0,0 +1,13 @@
+# utils/log_setup.py
+from __future__ import annotations
+import logging
+
+def setup_logging(quiet_httpx: bool = False) -> None:
+    """
+    스크립트 진입점용 로깅 설정 ("Saved N items" 같은 INFO 메시지 출력).
+    quiet_httpx: httpx의 INFO 요청 로그는 전체 URL(쿼리스트링의 API 키 포함)을 찍으므로,
+                 API 키를 쓰는 스크립트에서는 True로 끈다.
+    """
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    if quiet_httpx:
+        logging.getLogger("httpx").setLevel(logging.WARNING)
@@ -1,9 +1,22 @@
 # utils.py
 from __future__ import annotations
 from pathlib import Path
+import os
 import json
+import logging
 from typing import Iterable, Mapping, Any
 
+log = logging.getLogger(__name__)
+
+try:
+    import orjson
+
+    def _dumps(item: Mapping[str, Any]) -> bytes:
+        return orjson.dumps(item)
+except ImportError:  # orjson 없으면 표준 json으로
+    def _dumps(item: Mapping[str, Any]) -> bytes:
+        return json.dumps(item, ensure_ascii=False).encode("utf-8")
+
 def save_jsonl(items: Iterable[Mapping[str, Any]], outpath: str | Path, limit: int | None = None) -> Path:
     """
     items: dict의 이터러블(리스트/제너레이터 모두 OK)
@@ -14,12 +27,22 @@ def save_jsonl(items: Iterable[Mapping[str, Any]], outpath: str | Path, limit: i
     outpath = Path(outpath)
     outpath.parent.mkdir(parents=True, exist_ok=True)
 
+    # 임시 파일에 다 쓰고 fsync 한 번 → rename으로 교체 (중간에 죽어도 기존 파일은 온전)
+    tmp = outpath.with_suffix(outpath.suffix + ".tmp")
     n = 0
-    with outpath.open("w", encoding="utf-8") as f:
-        for item in items:
-            if limit is not None and n >= limit:
-                break
-            f.write(json.dumps(item, ensure_ascii=False) + "\n")
-            n += 1
-    print(f"Saved {n} items → {outpath}")
+    try:
+        with tmp.open("wb", buffering=1 << 20) as f:
+            for item in items:
+                if limit is not None and n >= limit:
+                    break
+                f.write(_dumps(item))
+                f.write(b"\n")
+                n += 1
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, outpath)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+    log.info("Saved %d items → %s", n, outpath)
     return outpath